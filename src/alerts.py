@@ -2,9 +2,41 @@
 from typing import Dict, Any, List, Optional, Callable
 from datetime import datetime, time
 import json
+import operator
+import os
+from time import monotonic
+
+from .jsonutil import loads
 
 logger = logging.getLogger(__name__)
 
+# Extractors for each supported alert condition
+_CONDITION_GETTERS: Dict[str, Callable[[Dict[str, Any]], Optional[float]]] = {
+    'temperature': lambda w: (w.get('temperature') or {}).get('current'),
+    'feels_like': lambda w: (w.get('temperature') or {}).get('feels_like'),
+    'humidity': lambda w: w.get('humidity'),
+    'pressure': lambda w: w.get('pressure'),
+    'wind': lambda w: (w.get('wind') or {}).get('speed'),
+    'clouds': lambda w: w.get('clouds'),
+    'precipitation': lambda w: ((w.get('precipitation') or {}).get('rain', 0)
+                                + (w.get('precipitation') or {}).get('snow', 0)),
+    'rain': lambda w: (w.get('precipitation') or {}).get('rain', 0),
+    'snow': lambda w: (w.get('precipitation') or {}).get('snow', 0),
+}
+
+# Comparison functions for each supported alert operator
+_OPS: Dict[str, Callable[[Any, Any], bool]] = {
+    'above': operator.gt,
+    'below': operator.lt,
+    'equals': operator.eq,
+}
+
+# Minimum time between repeats of the same alert
+ALERT_COOLDOWN_SECONDS = 21600.0
+
+# Number of recorded alerts between sweeps of expired history entries
+HISTORY_SWEEP_INTERVAL = 100
+
 class AlertChecker:
     """
     Checks if weather data meets alert conditions.
@@ -13,51 +45,103 @@ class AlertChecker:
     def __init__(self, config_path: str):
         """Initialize with configuration file path."""
         self.config_path = config_path
+        self._config_mtime_ns = None
         self.config = self._load_config()
-        self.alert_history = {}  # Keep track of already triggered alerts
+        self.alert_history = {}  # Alert ID -> monotonic time of last trigger
+        self._history_writes = 0
     
     def _load_config(self) -> Dict[str, Any]:
-        """Load configuration from file."""
+        """Load configuration from file, reusing it if the file is unchanged."""
         try:
-            with open(self.config_path, 'r', encoding='utf-8') as f:
-                config = json.load(f)
+            mtime_ns = os.stat(self.config_path).st_mtime_ns
+            if mtime_ns == self._config_mtime_ns:
+                return self.config
+            
+            with open(self.config_path, 'rb') as f:
+                config = loads(f.read())
+                self._config_mtime_ns = mtime_ns
+                
+                # Index locations by name for constant-time lookup
+                self._locations_by_name = {
+                    loc.get('name', '').strip(): loc for loc in config.get('locations', [])
+                }
+                logger.debug("Loaded locations: %s", list(self._locations_by_name))
                 
-                # Debug: log location names
-                location_names = [loc.get('name') for loc in config.get('locations', [])]
-                logger.debug(f"Loaded locations: {location_names}")
+                self._compile_rules()
+                self._parse_quiet_hours(config)
                 
                 return config
         except (json.JSONDecodeError, FileNotFoundError) as e:
             logger.error(f"Error loading configuration: {e}")
             raise
     
+    def _compile_rules(self):
+        """
+        Precompile the alerts of each location into rule tuples of
+        (alert_id, condition, getter, operator function, threshold, message).
+        """
+        self._rules = {}
+        for name, location in self._locations_by_name.items():
+            rules = []
+            for alert in location.get('alerts', []):
+                condition = alert.get('condition')
+                op_name = alert.get('operator')
+                threshold = alert.get('value')
+                message = alert.get('message', f"Weather alert for {name}")
+                
+                getter = _CONDITION_GETTERS.get(condition)
+                if getter is None:
+                    logger.warning("Unknown condition: %s", condition)
+                    continue
+                
+                op = _OPS.get(op_name)
+                if op is None:
+                    logger.warning("Unknown operator: %s", op_name)
+                    continue
+                
+                # Unique ID for this alert to avoid duplicates
+                alert_id = f"{name}_{condition}_{op_name}_{threshold}"
+                rules.append((alert_id, condition, getter, op, threshold, message))
+            
+            self._rules[name] = rules
+    
     def refresh_config(self):
         """Reload configuration from file."""
         self.config = self._load_config()
     
-    def is_quiet_hours(self) -> bool:
-        """Check if current time is within quiet hours."""
-        quiet_hours = self.config.get('preferences', {}).get('quiet_hours', {})
+    def _parse_quiet_hours(self, config: Dict[str, Any]):
+        """Parse the quiet hours window once so checks only compare times."""
+        quiet_hours = config.get('preferences', {}).get('quiet_hours', {})
+        self._quiet_enabled = quiet_hours.get('enabled', False)
+        self._quiet_start = None
+        self._quiet_end = None
         
-        if not quiet_hours.get('enabled', False):
-            return False
+        if not self._quiet_enabled:
+            return
         
-        now = datetime.now().time()
         start_str = quiet_hours.get('start', '22:00')
         end_str = quiet_hours.get('end', '07:00')
         
         try:
-            start = datetime.strptime(start_str, '%H:%M').time()
-            end = datetime.strptime(end_str, '%H:%M').time()
-            
-            # Handle overnight quiet hours
-            if start > end:
-                return now >= start or now <= end
-            else:
-                return start <= now <= end
+            self._quiet_start = datetime.strptime(start_str, '%H:%M').time()
+            self._quiet_end = datetime.strptime(end_str, '%H:%M').time()
         except ValueError:
             logger.error(f"Invalid quiet hours format: {start_str} - {end_str}")
+            self._quiet_enabled = False
+    
+    def is_quiet_hours(self) -> bool:
+        """Check if current time is within quiet hours."""
+        if not self._quiet_enabled:
             return False
+        
+        now = datetime.now().time()
+        start, end = self._quiet_start, self._quiet_end
+        
+        # Handle overnight quiet hours
+        if start > end:
+            return now >= start or now <= end
+        else:
+            return start <= now <= end
     
     def check_location_alerts(self, location_name: str, weather_data: Dict[str, Any]) -> List[Dict[str, Any]]:
         """
@@ -70,100 +154,55 @@ def check_location_alerts(self, location_name: str, weather_data: Dict[str, Any]
         
         triggered_alerts = []
         
-        # Debug: print the location name being checked
-        logger.debug(f"Looking for location in config: '{location_name}'")
-        
-        # Find the location in config
-        location = None
-        for loc in self.config.get('locations', []):
-            config_name = loc.get('name', '')
-            logger.debug(f"Comparing with config location: '{config_name}'")
-            
-            if config_name.strip() == location_name.strip():
-                logger.debug(f"Found location match: {config_name}")
-                location = loc
-                break
+        # Find the compiled rules for the location
+        rules = self._rules.get(location_name.strip())
         
-        if not location:
-            logger.warning(f"Location not found in config: {location_name}")
+        if rules is None:
+            logger.warning("Location not found in config: %s", location_name)
             return []
         
         # Check each alert condition for the location
-        for alert in location.get('alerts', []):
-            condition = alert.get('condition')
-            operator = alert.get('operator')
-            threshold = alert.get('value')
-            message = alert.get('message', f"Weather alert for {location_name}")
+        for alert_id, condition, getter, op, threshold, message in rules:
+            try:
+                value = getter(weather_data)
+            except (TypeError, KeyError) as e:
+                logger.error("Error extracting condition %s: %s", condition, e)
+                continue
             
-            if self._check_condition(weather_data, condition, operator, threshold):
-                # Create a unique ID for this alert to avoid duplicates
-                alert_id = f"{location_name}_{condition}_{operator}_{threshold}"
-                
-                # Check if this alert was already triggered recently
-                last_trigger = self.alert_history.get(alert_id)
-                current_time = datetime.now()
-                
-                # Only trigger if it's been at least 6 hours since last alert
-                if not last_trigger or (current_time - last_trigger).total_seconds() > 21600:
-                    self.alert_history[alert_id] = current_time
-                    
-                    triggered_alert = {
-                        'location': location_name,
-                        'condition': condition,
-                        'threshold': threshold,
-                        'current_value': self._get_condition_value(weather_data, condition),
-                        'message': message,
-                        'timestamp': current_time.isoformat()
-                    }
-                    triggered_alerts.append(triggered_alert)
-                    
-                    logger.info(f"Alert triggered: {triggered_alert}")
+            if value is None or not op(value, threshold):
+                continue
+            
+            # Only trigger if it's been at least 6 hours since last alert
+            last_trigger = self.alert_history.get(alert_id)
+            now = monotonic()
+            if last_trigger is not None and now - last_trigger <= ALERT_COOLDOWN_SECONDS:
+                continue
+            
+            self._record_alert(alert_id, now)
+            
+            triggered_alert = {
+                'location': location_name,
+                'condition': condition,
+                'threshold': threshold,
+                'current_value': value,
+                'message': message,
+                'timestamp': datetime.now().isoformat()
+            }
+            triggered_alerts.append(triggered_alert)
+            
+            if logger.isEnabledFor(logging.INFO):
+                logger.info("Alert triggered: %s", triggered_alert)
         
         return triggered_alerts
     
-    def _check_condition(self, weather_data: Dict[str, Any], condition: str, operator: str, threshold: float) -> bool:
-        """Check if a weather condition meets the alert criteria."""
-        current_value = self._get_condition_value(weather_data, condition)
-        
-        if current_value is None:
-            return False
+    def _record_alert(self, alert_id: str, now: float):
+        """Record an alert trigger, periodically dropping expired entries."""
+        self.alert_history[alert_id] = now
+        self._history_writes += 1
         
-        if operator == 'above':
-            return current_value > threshold
-        elif operator == 'below':
-            return current_value < threshold
-        elif operator == 'equals':
-            return current_value == threshold
-        else:
-            logger.warning(f"Unknown operator: {operator}")
-            return False
-    
-    def _get_condition_value(self, weather_data: Dict[str, Any], condition: str) -> Optional[float]:
-        """Extract the value for a condition from weather data."""
-        try:
-            if condition == 'temperature':
-                return weather_data.get('temperature', {}).get('current')
-            elif condition == 'feels_like':
-                return weather_data.get('temperature', {}).get('feels_like')
-            elif condition == 'humidity':
-                return weather_data.get('humidity')
-            elif condition == 'pressure':
-                return weather_data.get('pressure')
-            elif condition == 'wind':
-                return weather_data.get('wind', {}).get('speed')
-            elif condition == 'clouds':
-                return weather_data.get('clouds')
-            elif condition == 'precipitation':
-                rain = weather_data.get('precipitation', {}).get('rain', 0)
-                snow = weather_data.get('precipitation', {}).get('snow', 0)
-                return rain + snow
-            elif condition == 'rain':
-                return weather_data.get('precipitation', {}).get('rain', 0)
-            elif condition == 'snow':
-                return weather_data.get('precipitation', {}).get('snow', 0)
-            else:
-                logger.warning(f"Unknown condition: {condition}")
-                return None
-        except (TypeError, KeyError) as e:
-            logger.error(f"Error extracting condition {condition}: {e}")
-            return None
\ No newline at end of file
+        if self._history_writes >= HISTORY_SWEEP_INTERVAL:
+            self._history_writes = 0
+            self.alert_history = {
+                k: v for k, v in self.alert_history.items()
+                if now - v <= ALERT_COOLDOWN_SECONDS
+            }
@@ -1,12 +1,78 @@
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+import functools
 import json
 import logging
 import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, Iterator, List, Optional, Tuple
+
+from .jsonutil import JSONDecodeError, loads
 
 logger = logging.getLogger(__name__)
 
+# (connect, read) timeouts in seconds for provider requests
+REQUEST_TIMEOUT = (3.05, 10)
+
+# Upper bound on concurrent requests issued by batch methods
+MAX_BATCH_WORKERS = 16
+
+# OpenWeatherMap refreshes current conditions roughly every 10 minutes
+DEFAULT_CACHE_TTL_SECONDS = 300
+
+@functools.lru_cache(maxsize=1)
+def _resolve_api_key() -> Optional[str]:
+    """
+    Get the API key from the OPENWEATHER_API_KEY environment variable or,
+    failing that, the .api_key file. Resolved once per process.
+    """
+    api_key = os.environ.get('OPENWEATHER_API_KEY')
+    if api_key:
+        return api_key
+    
+    try:
+        with open('.api_key', 'r') as f:
+            return f.read().strip() or None
+    except FileNotFoundError:
+        return None
+
+def _standardize(item: Dict[str, Any], precip_period: str, result: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Add the standardized weather fields of an OpenWeatherMap observation
+    to result and return it. precip_period is the rain/snow key ('1h', '3h').
+    """
+    main = item.get('main') or {}
+    wind = item.get('wind') or {}
+    weather = (item.get('weather') or ({},))[0]
+    
+    result['temperature'] = {
+        'current': main.get('temp'),
+        'feels_like': main.get('feels_like'),
+        'min': main.get('temp_min'),
+        'max': main.get('temp_max'),
+    }
+    result['humidity'] = main.get('humidity')
+    result['pressure'] = main.get('pressure')
+    result['wind'] = {
+        'speed': wind.get('speed'),
+        'direction': wind.get('deg'),
+    }
+    result['clouds'] = (item.get('clouds') or {}).get('all')
+    result['precipitation'] = {
+        'rain': (item.get('rain') or {}).get(precip_period, 0),
+        'snow': (item.get('snow') or {}).get(precip_period, 0),
+    }
+    result['weather'] = {
+        'condition': weather.get('main'),
+        'description': weather.get('description'),
+        'icon': weather.get('icon'),
+    }
+    return result
+
 class WeatherAPI:
     """Interface for fetching weather data from various providers."""
     
@@ -15,22 +81,31 @@ def __init__(self, config: Dict[str, Any]):
         self.config = config
         self.service = config.get('service', 'openweathermap')
         
-        # Get API key from environment variable or use the one in .api_key file
-        self.api_key = os.environ.get('OPENWEATHER_API_KEY')
-        
-        # If not in environment, try to read from .api_key file
-        if not self.api_key:
-            try:
-                with open('.api_key', 'r') as f:
-                    self.api_key = f.read().strip()
-            except FileNotFoundError:
-                self.api_key = None
+        self.api_key = _resolve_api_key()
         
         self.units = config.get('units', 'metric')
         
+        # Current weather cache: (lat, lon, units) -> (fetched_at, data, etag)
+        self.cache_ttl = config.get('cache_ttl_seconds', DEFAULT_CACHE_TTL_SECONDS)
+        self._cache: Dict[Tuple[float, float, str], Tuple[float, Dict[str, Any], Optional[str]]] = {}
+        self._cache_lock = threading.Lock()
+        
         if not self.api_key:
             logger.error("API key not provided")
             raise ValueError("OpenWeatherMap API key is required")
+        
+        # Reuse connections (keep-alive) across requests and retry transient errors
+        self._session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=16,
+            pool_maxsize=32,
+            max_retries=Retry(
+                total=3,
+                backoff_factor=0.3,
+                status_forcelist=[429, 500, 502, 503, 504]
+            )
+        )
+        self._session.mount('https://', adapter)
     
     def get_current_weather(self, latitude: float, longitude: float) -> Dict[str, Any]:
         """Get current weather for a location."""
@@ -39,6 +114,27 @@ def get_current_weather(self, latitude: float, longitude: float) -> Dict[str, An
         else:
             raise ValueError(f"Unsupported weather service: {self.service}")
     
+    def get_current_weather_batch(self, coordinates: List[Tuple[float, float]]
+                                  ) -> Iterator[Tuple[int, Optional[Dict[str, Any]], Optional[Exception]]]:
+        """
+        Get current weather for several (latitude, longitude) pairs concurrently.
+        Yields (index, weather, error) as each request completes, where index is
+        the position in coordinates and exactly one of weather and error is set.
+        """
+        if not coordinates:
+            return
+        
+        with ThreadPoolExecutor(max_workers=min(MAX_BATCH_WORKERS, len(coordinates))) as executor:
+            futures = {
+                executor.submit(self.get_current_weather, lat, lon): i
+                for i, (lat, lon) in enumerate(coordinates)
+            }
+            for future in as_completed(futures):
+                try:
+                    yield futures[future], future.result(), None
+                except Exception as e:
+                    yield futures[future], None, e
+    
     def get_forecast(self, latitude: float, longitude: float, days: int = 5) -> List[Dict[str, Any]]:
         """Get weather forecast for a location."""
         if self.service == 'openweathermap':
@@ -53,8 +149,27 @@ def get_alerts(self, latitude: float, longitude: float) -> List[Dict[str, Any]]:
         else:
             raise ValueError(f"Unsupported weather service: {self.service}")
     
+    def _store_cached(self, key: Tuple[float, float, str], data: Dict[str, Any], etag: Optional[str]):
+        """Cache a response, purging expired entries that cannot be revalidated."""
+        now = time.monotonic()
+        with self._cache_lock:
+            expired = [k for k, entry in self._cache.items()
+                       if not entry[2] and now - entry[0] >= self.cache_ttl]
+            for k in expired:
+                del self._cache[k]
+            self._cache[key] = (now, data, etag)
+    
     def _get_openweathermap_current(self, latitude: float, longitude: float) -> Dict[str, Any]:
         """Get current weather from OpenWeatherMap API."""
+        key = (latitude, longitude, self.units)
+        with self._cache_lock:
+            entry = self._cache.get(key)
+        
+        # Serve from cache while the entry is fresh
+        if entry and time.monotonic() - entry[0] < self.cache_ttl:
+            logger.debug("Using cached weather for %s, %s", latitude, longitude)
+            return entry[1]
+        
         url = f"https://api.openweathermap.org/data/2.5/weather"
         params = {
             'lat': latitude,
@@ -63,43 +178,34 @@ def _get_openweathermap_current(self, latitude: float, longitude: float) -> Dict
             'units': self.units
         }
         
+        # Revalidate a stale entry instead of downloading it again
+        headers = {}
+        if entry and entry[2]:
+            headers['If-None-Match'] = entry[2]
+        
         try:
-            response = requests.get(url, params=params)
+            response = self._session.get(url, params=params, headers=headers, timeout=REQUEST_TIMEOUT)
             response.raise_for_status()
-            data = response.json()
+            
+            if response.status_code == 304 and entry:
+                self._store_cached(key, entry[1], entry[2])
+                return entry[1]
+            
+            data = loads(response.content)
             
             # Transform data into a standardized format
-            return {
+            weather = _standardize(data, '1h', {
                 'timestamp': datetime.now().isoformat(),
                 'location': {
                     'name': data.get('name', 'Unknown'),
                     'latitude': latitude,
                     'longitude': longitude,
                 },
-                'temperature': {
-                    'current': data.get('main', {}).get('temp'),
-                    'feels_like': data.get('main', {}).get('feels_like'),
-                    'min': data.get('main', {}).get('temp_min'),
-                    'max': data.get('main', {}).get('temp_max'),
-                },
-                'humidity': data.get('main', {}).get('humidity'),
-                'pressure': data.get('main', {}).get('pressure'),
-                'wind': {
-                    'speed': data.get('wind', {}).get('speed'),
-                    'direction': data.get('wind', {}).get('deg'),
-                },
-                'clouds': data.get('clouds', {}).get('all'),
-                'precipitation': {
-                    'rain': data.get('rain', {}).get('1h', 0),
-                    'snow': data.get('snow', {}).get('1h', 0),
-                },
-                'weather': {
-                    'condition': data.get('weather', [{}])[0].get('main'),
-                    'description': data.get('weather', [{}])[0].get('description'),
-                    'icon': data.get('weather', [{}])[0].get('icon'),
-                },
-            }
-        except requests.exceptions.RequestException as e:
+            })
+            
+            self._store_cached(key, weather, response.headers.get('ETag'))
+            return weather
+        except (requests.exceptions.RequestException, JSONDecodeError) as e:
             logger.error(f"Error fetching current weather: {e}")
             raise
     
@@ -115,41 +221,17 @@ def _get_openweathermap_forecast(self, latitude: float, longitude: float, days:
         }
         
         try:
-            response = requests.get(url, params=params)
+            response = self._session.get(url, params=params, timeout=REQUEST_TIMEOUT)
             response.raise_for_status()
-            data = response.json()
+            data = loads(response.content)
             
-            forecasts = []
-            for item in data.get('list', []):
-                forecast = {
-                    'timestamp': item.get('dt_txt'),
-                    'temperature': {
-                        'current': item.get('main', {}).get('temp'),
-                        'feels_like': item.get('main', {}).get('feels_like'),
-                        'min': item.get('main', {}).get('temp_min'),
-                        'max': item.get('main', {}).get('temp_max'),
-                    },
-                    'humidity': item.get('main', {}).get('humidity'),
-                    'pressure': item.get('main', {}).get('pressure'),
-                    'wind': {
-                        'speed': item.get('wind', {}).get('speed'),
-                        'direction': item.get('wind', {}).get('deg'),
-                    },
-                    'clouds': item.get('clouds', {}).get('all'),
-                    'precipitation': {
-                        'rain': item.get('rain', {}).get('3h', 0),
-                        'snow': item.get('snow', {}).get('3h', 0),
-                    },
-                    'weather': {
-                        'condition': item.get('weather', [{}])[0].get('main'),
-                        'description': item.get('weather', [{}])[0].get('description'),
-                        'icon': item.get('weather', [{}])[0].get('icon'),
-                    },
-                }
-                forecasts.append(forecast)
+            items = data.get('list') or ()
+            forecasts = [None] * len(items)
+            for i, item in enumerate(items):
+                forecasts[i] = _standardize(item, '3h', {'timestamp': item.get('dt_txt')})
             
             return forecasts
-        except requests.exceptions.RequestException as e:
+        except (requests.exceptions.RequestException, JSONDecodeError) as e:
             logger.error(f"Error fetching forecast: {e}")
             raise
     
@@ -165,9 +247,9 @@ def _get_openweathermap_alerts(self, latitude: float, longitude: float) -> List[
         }
         
         try:
-            response = requests.get(url, params=params)
+            response = self._session.get(url, params=params, timeout=REQUEST_TIMEOUT)
             response.raise_for_status()
-            data = response.json()
+            data = loads(response.content)
             
             alerts = []
             for alert in data.get('alerts', []):
@@ -181,6 +263,6 @@ def _get_openweathermap_alerts(self, latitude: float, longitude: float) -> List[
                 alerts.append(alert_data)
             
             return alerts
-        except requests.exceptions.RequestException as e:
+        except (requests.exceptions.RequestException, JSONDecodeError) as e:
             logger.error(f"Error fetching alerts: {e}")
             raise
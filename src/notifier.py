@@ -1,14 +1,120 @@
+import base64
 import logging
-from typing import Dict, Any
+from typing import Dict, Any, List
 import json
 import os
+import queue
 import subprocess
 import tempfile
-import sys
+import threading
 import time
 
+from .jsonutil import loads
+
+try:
+    from winotify import Notification, audio
+    _HAS_WINOTIFY = True
+except ImportError:
+    _HAS_WINOTIFY = False
+
 logger = logging.getLogger(__name__)
 
+# Display units per condition, keyed by the configured unit system
+_UNIT_TABLE = {
+    'metric': {
+        'temperature': '°C',
+        'feels_like': '°C',
+        'pressure': ' hPa',
+        'humidity': '%',
+        'wind': ' m/s',
+        'precipitation': ' mm',
+        'rain': ' mm',
+        'snow': ' mm',
+    },
+    'imperial': {
+        'temperature': '°F',
+        'feels_like': '°F',
+        'pressure': ' hPa',
+        'humidity': '%',
+        'wind': ' mph',
+        'precipitation': ' in',
+        'rain': ' in',
+        'snow': ' in',
+    },
+}
+
+# Seconds before the full notification method ladder is probed again
+METHOD_REPROBE_SECONDS = 300
+
+# Seconds to wait for the PowerShell worker to show a notification
+POWERSHELL_TIMEOUT_SECONDS = 15
+
+# Lines printed by the PowerShell worker after each notification attempt
+_PS_OK = '__WAS_OK__'
+_PS_FAIL = '__WAS_FAIL__'
+
+# Sent once to the PowerShell worker; it must be a single line because the
+# worker reads commands from stdin line by line.
+_PS_SETUP = ' '.join(line.strip() for line in '''
+Import-Module -Name BurntToast -ErrorAction SilentlyContinue;
+$ErrorActionPreference = 'Stop';
+function ConvertFrom-WasText([string]$Encoded) {
+    [System.Text.Encoding]::UTF8.GetString([System.Convert]::FromBase64String($Encoded))
+}
+function Show-WeatherToast([string]$Title, [string]$Message) {
+    if (Get-Module -Name BurntToast) {
+        New-BurntToastNotification -Text $Title, $Message -Silent:$false
+    } else {
+        [Windows.UI.Notifications.ToastNotificationManager, Windows.UI.Notifications, ContentType = WindowsRuntime] | Out-Null;
+        [Windows.UI.Notifications.ToastNotification, Windows.UI.Notifications, ContentType = WindowsRuntime] | Out-Null;
+        [Windows.Data.Xml.Dom.XmlDocument, Windows.Data.Xml.Dom.XmlDocument, ContentType = WindowsRuntime] | Out-Null;
+        $t = [System.Security.SecurityElement]::Escape($Title);
+        $m = [System.Security.SecurityElement]::Escape($Message);
+        $template = "<toast><visual><binding template='ToastGeneric'><text>$t</text><text>$m</text></binding></visual><audio src='ms-winsoundevent:Notification.Default' loop='false'/></toast>";
+        $xml = New-Object Windows.Data.Xml.Dom.XmlDocument;
+        $xml.LoadXml($template);
+        $toast = New-Object Windows.UI.Notifications.ToastNotification $xml;
+        [Windows.UI.Notifications.ToastNotificationManager]::CreateToastNotifier('Weather Alert System').Show($toast)
+    }
+}
+'''.strip().splitlines())
+
+# Balloon tip fallback; reads the title (first line) and message (rest)
+# from the UTF-16 data file passed as its only argument, then deletes it.
+_VBS_BALLOON = '''
+Set objFSO = CreateObject("Scripting.FileSystemObject")
+strDataPath = WScript.Arguments(0)
+Set objData = objFSO.OpenTextFile(strDataPath, 1, False, -1)
+strTitle = objData.ReadLine
+strMessage = objData.ReadAll
+objData.Close
+objFSO.DeleteFile strDataPath
+Set oShell = CreateObject("Wscript.Shell")
+strSystray = oShell.ExpandEnvironmentStrings("%SYSTEMROOT%") & "\\system32\\systray.exe"
+If objFSO.FileExists(strSystray) Then
+    Set objWshShell = CreateObject("WScript.Shell")
+    objWshShell.Run strSystray
+    WScript.Sleep 100
+    objWshShell.SendKeys "%"
+    WScript.Sleep 100
+    oShell.RegWrite "HKCU\\Software\\Microsoft\\Windows\\CurrentVersion\\Explorer\\TrayNotify\\BalloonTip", 1, "REG_DWORD"
+    oShell.RegWrite "HKCU\\Software\\Microsoft\\Windows\\CurrentVersion\\Explorer\\TrayNotify\\IconStreams", 1, "REG_BINARY"
+    WScript.Sleep 100
+    objWshShell.Popup strMessage, 15, strTitle, 0 + 64
+Else
+    oShell.Popup strMessage, 15, strTitle, 0 + 64
+End If
+'''
+
+def _ps_text(value: str) -> str:
+    """
+    Build a PowerShell expression evaluating to the given text. The text is
+    passed base64-encoded so quotes, newlines and non-ASCII characters
+    cannot break the command.
+    """
+    encoded = base64.b64encode(value.encode('utf-8')).decode('ascii')
+    return f"(ConvertFrom-WasText '{encoded}')"
+
 class Notifier:
     """
     Windows notification system using winotify for modern toast notifications.
@@ -17,27 +123,39 @@ class Notifier:
     def __init__(self, config_path: str):
         """Initialize with configuration file path."""
         self.config_path = config_path
+        self._config_mtime_ns = None
         self.config = self._load_config()
-        self._check_winotify()
-    
-    def _check_winotify(self):
-        """Check if winotify is installed and install if not."""
-        try:
-            import winotify
-            logger.debug("winotify is already installed")
-        except ImportError:
-            logger.info("Installing winotify package...")
-            try:
-                subprocess.check_call([sys.executable, "-m", "pip", "install", "winotify"])
-                logger.info("winotify installed successfully")
-            except Exception as e:
-                logger.error(f"Failed to install winotify: {e}")
+        self._unit_map = self._select_unit_map()
+        
+        # Long-lived PowerShell process used for toast notifications
+        self._ps = None
+        self._ps_output = None
+        
+        # Balloon tip script, written to a temp file on first use
+        self._vbs_path = None
+        
+        # Last notification method that worked, and when it was chosen
+        self._preferred = None
+        self._preferred_since = 0.0
+        
+        # Resolve the toast icon once (weather icon from Windows)
+        icon_path = os.path.expandvars("%SystemRoot%\\System32\\SHELL32.dll")
+        self._icon_path = icon_path + ",16" if os.path.exists(icon_path) else None  # Weather icon index
+        
+        if not _HAS_WINOTIFY:
+            logger.info("winotify is not installed, falling back to PowerShell/VBS notifications")
     
     def _load_config(self) -> Dict[str, Any]:
-        """Load configuration from file."""
+        """Load configuration from file, reusing it if the file is unchanged."""
         try:
-            with open(self.config_path, 'r', encoding='utf-8') as f:
-                return json.load(f)
+            mtime_ns = os.stat(self.config_path).st_mtime_ns
+            if mtime_ns == self._config_mtime_ns:
+                return self.config
+            
+            with open(self.config_path, 'rb') as f:
+                config = loads(f.read())
+                self._config_mtime_ns = mtime_ns
+                return config
         except (json.JSONDecodeError, FileNotFoundError) as e:
             logger.error(f"Error loading configuration: {e}")
             raise
@@ -45,6 +163,7 @@ def _load_config(self) -> Dict[str, Any]:
     def refresh_config(self):
         """Reload configuration from file."""
         self.config = self._load_config()
+        self._unit_map = self._select_unit_map()
     
     def send_alert(self, alert: Dict[str, Any]) -> bool:
         """Send a desktop notification for a weather alert."""
@@ -52,6 +171,42 @@ def send_alert(self, alert: Dict[str, Any]) -> bool:
         title = alert.get('message', 'Weather alert')
         message = self._format_alert_message(alert)
         
+        return self._notify(title, message)
+    
+    def send_alerts(self, alerts: List[Dict[str, Any]]) -> bool:
+        """
+        Send desktop notifications for a batch of alerts.
+        Several alerts are combined into a single notification.
+        """
+        if not alerts:
+            return True
+        
+        if len(alerts) == 1:
+            return self.send_alert(alerts[0])
+        
+        title = f"{len(alerts)} weather alerts"
+        message = "\n".join(
+            f"{alert.get('location', 'Unknown location')}: {self._format_alert_message(alert)}"
+            for alert in alerts
+        )
+        
+        return self._notify(title, message)
+    
+    def _notify(self, title: str, message: str) -> bool:
+        """Show a notification using the first method that succeeds."""
+        # Use the method that worked last time until it fails or is due for a re-probe
+        preferred = self._preferred
+        if preferred is not None:
+            if time.monotonic() - self._preferred_since < METHOD_REPROBE_SECONDS:
+                try:
+                    if preferred(title, message):
+                        return True
+                except Exception as e:
+                    logger.warning(f"Notification method failed: {e}")
+            else:
+                preferred = None
+            self._preferred = None
+        
         # Try winotify first, then fall back to other methods
         methods = [
             self._try_winotify,
@@ -60,9 +215,13 @@ def send_alert(self, alert: Dict[str, Any]) -> bool:
         ]
         
         for method in methods:
+            if method == preferred:
+                continue
             try:
                 success = method(title, message)
                 if success:
+                    self._preferred = method
+                    self._preferred_since = time.monotonic()
                     return True
             except Exception as e:
                 logger.warning(f"Notification method failed: {e}")
@@ -88,28 +247,21 @@ def _format_alert_message(self, alert: Dict[str, Any]) -> str:
         alert_text = f"{condition_name} is {current_value_str} (Threshold: {threshold_str})"
         return alert_text
     
+    def _select_unit_map(self) -> Dict[str, str]:
+        """Pick the display units for the configured unit system."""
+        units_config = self.config.get('api', {}).get('units', 'metric')
+        return _UNIT_TABLE['metric' if units_config == 'metric' else 'imperial']
+    
     def _get_condition_units(self, condition: str) -> str:
         """Get the appropriate units for a weather condition."""
-        units_config = self.config.get('api', {}).get('units', 'metric')
-        
-        if condition in ['temperature', 'feels_like']:
-            return '°C' if units_config == 'metric' else '°F'
-        elif condition == 'pressure':
-            return ' hPa'
-        elif condition == 'humidity':
-            return '%'
-        elif condition in ['wind']:
-            return ' m/s' if units_config == 'metric' else ' mph'
-        elif condition in ['precipitation', 'rain', 'snow']:
-            return ' mm' if units_config == 'metric' else ' in'
-        else:
-            return ''
+        return self._unit_map.get(condition, '')
     
     def _try_winotify(self, title: str, message: str) -> bool:
         """Try to send a toast notification using winotify."""
+        if not _HAS_WINOTIFY:
+            return False
+        
         try:
-            from winotify import Notification, audio
-            
             # Create notification
             toast = Notification(
                 app_id="Weather Alert System",
@@ -119,9 +271,8 @@ def _try_winotify(self, title: str, message: str) -> bool:
             )
             
             # Set icon if available (uses weather icon from Windows)
-            icon_path = os.path.expandvars("%SystemRoot%\\System32\\SHELL32.dll")
-            if os.path.exists(icon_path):
-                toast.icon = icon_path + ",16"  # Weather icon index
+            if self._icon_path:
+                toast.icon = self._icon_path
             
             # Set sound
             toast.set_audio(audio.Default, loop=False)
@@ -136,96 +287,105 @@ def _try_winotify(self, title: str, message: str) -> bool:
             logger.warning(f"Failed to send winotify notification: {e}")
             return False
     
+    def _start_powershell(self) -> subprocess.Popen:
+        """Start the PowerShell worker, or return it if it is still running."""
+        if self._ps is not None and self._ps.poll() is None:
+            return self._ps
+        
+        self._ps = subprocess.Popen(
+            ['powershell', '-NoProfile', '-NonInteractive', '-ExecutionPolicy', 'Bypass', '-Command', '-'],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+            text=True,
+            encoding='utf-8',
+            errors='replace'
+        )
+        
+        # Read output on a background thread so waits can time out
+        self._ps_output = queue.Queue()
+        threading.Thread(
+            target=self._read_powershell_output,
+            args=(self._ps.stdout, self._ps_output),
+            daemon=True
+        ).start()
+        
+        self._ps.stdin.write(_PS_SETUP + '\n')
+        self._ps.stdin.flush()
+        logger.debug("Started PowerShell notification worker")
+        return self._ps
+    
+    @staticmethod
+    def _read_powershell_output(stream, output: queue.Queue):
+        """Forward worker output lines to a queue, then None at end of stream."""
+        for line in stream:
+            output.put(line.rstrip())
+        output.put(None)
+    
+    def close(self):
+        """Stop the PowerShell worker and remove the balloon tip script."""
+        if self._ps is not None:
+            try:
+                self._ps.kill()
+            except OSError:
+                pass
+            self._ps = None
+            self._ps_output = None
+        
+        if self._vbs_path is not None:
+            try:
+                os.unlink(self._vbs_path)
+            except OSError:
+                pass
+            self._vbs_path = None
+    
     def _try_powershell_toast(self, title: str, message: str) -> bool:
-        """Try to show a toast notification using PowerShell."""
+        """Try to show a toast notification through the PowerShell worker."""
         try:
-            # Use direct BurntToast module if available
-            ps_script = f'''
-            Import-Module -Name BurntToast -ErrorAction SilentlyContinue
-            if (Get-Module -Name BurntToast) {{
-                New-BurntToastNotification -Text "{title}", "{message}" -Silent:$false
-            }} else {{
-                # Fallback to Windows.UI.Notifications API
-                [Windows.UI.Notifications.ToastNotificationManager, Windows.UI.Notifications, ContentType = WindowsRuntime] | Out-Null
-                [Windows.UI.Notifications.ToastNotification, Windows.UI.Notifications, ContentType = WindowsRuntime] | Out-Null
-                [Windows.Data.Xml.Dom.XmlDocument, Windows.Data.Xml.Dom.XmlDocument, ContentType = WindowsRuntime] | Out-Null
-
-                $APP_ID = 'Weather Alert System'
-
-                $template = @"
-                <toast>
-                    <visual>
-                        <binding template="ToastGeneric">
-                            <text>{title}</text>
-                            <text>{message}</text>
-                        </binding>
-                    </visual>
-                    <audio src="ms-winsoundevent:Notification.Default" loop="false"/>
-                </toast>
-                "@
-
-                $xml = New-Object Windows.Data.Xml.Dom.XmlDocument
-                $xml.LoadXml($template)
-                $toast = New-Object Windows.UI.Notifications.ToastNotification $xml
-                [Windows.UI.Notifications.ToastNotificationManager]::CreateToastNotifier($APP_ID).Show($toast)
-            }}
-            '''
+            ps = self._start_powershell()
+            output = self._ps_output
             
-            # Save to temp file
-            fd, path = tempfile.mkstemp(suffix='.ps1')
-            with os.fdopen(fd, 'w', encoding='utf-8') as f:
-                f.write(ps_script)
-            
-            # Run PowerShell with appropriate flags
-            result = subprocess.run(
-                ['powershell', '-ExecutionPolicy', 'Bypass', '-File', path],
-                capture_output=True,
-                text=True
+            ps.stdin.write(
+                f"try {{ Show-WeatherToast {_ps_text(title)} {_ps_text(message)}; '{_PS_OK}' }} "
+                f"catch {{ '{_PS_FAIL} ' + $_ }}\n"
             )
+            ps.stdin.flush()
             
-            # Clean up
-            try:
-                os.unlink(path)
-            except:
-                pass
-            
-            if result.returncode == 0:
-                logger.info(f"PowerShell toast notification sent: {title}")
-                return True
-            else:
-                logger.warning(f"PowerShell error: {result.stderr}")
-                return False
-            
+            deadline = time.monotonic() + POWERSHELL_TIMEOUT_SECONDS
+            while True:
+                line = output.get(timeout=max(0, deadline - time.monotonic()))
+                if line is None:
+                    logger.warning("PowerShell worker exited unexpectedly")
+                    self.close()
+                    return False
+                if line.startswith(_PS_OK):
+                    logger.info(f"PowerShell toast notification sent: {title}")
+                    return True
+                if line.startswith(_PS_FAIL):
+                    logger.warning(f"PowerShell error: {line[len(_PS_FAIL):].strip()}")
+                    return False
+        
+        except queue.Empty:
+            logger.warning("Timed out waiting for PowerShell toast")
+            self.close()
+            return False
         except Exception as e:
             logger.warning(f"Failed to send PowerShell toast: {e}")
+            self.close()
             return False
     
     def _try_balloon_tip(self, title: str, message: str) -> bool:
         """Show a balloon tip notification using VBS (non-intrusive fallback)."""
         try:
-            vbs_script = f'''
-            Set oShell = CreateObject("Wscript.Shell")
-            strSystray = oShell.ExpandEnvironmentStrings("%SYSTEMROOT%") & "\\system32\\systray.exe"
-            Set objFSO = CreateObject("Scripting.FileSystemObject")
-            If objFSO.FileExists(strSystray) Then
-                Set objWshShell = CreateObject("WScript.Shell")
-                objWshShell.Run strSystray
-                WScript.Sleep 100
-                objWshShell.SendKeys "%"
-                WScript.Sleep 100
-                oShell.RegWrite "HKCU\\Software\\Microsoft\\Windows\\CurrentVersion\\Explorer\\TrayNotify\\BalloonTip", 1, "REG_DWORD"
-                oShell.RegWrite "HKCU\\Software\\Microsoft\\Windows\\CurrentVersion\\Explorer\\TrayNotify\\IconStreams", 1, "REG_BINARY"
-                WScript.Sleep 100
-                objWshShell.Popup "{message}", 15, "{title}", 0 + 64
-            Else
-                oShell.Popup "{message}", 15, "{title}", 0 + 64
-            End If
-            '''
+            if self._vbs_path is None or not os.path.exists(self._vbs_path):
+                fd, self._vbs_path = tempfile.mkstemp(suffix='.vbs')
+                with os.fdopen(fd, 'w', encoding='ascii') as f:
+                    f.write(_VBS_BALLOON)
             
-            # Save to temp file
-            fd, path = tempfile.mkstemp(suffix='.vbs')
-            with os.fdopen(fd, 'w', encoding='utf-8') as f:
-                f.write(vbs_script)
+            # Title and message are passed as data, never as script source
+            fd, data_path = tempfile.mkstemp(suffix='.txt')
+            with os.fdopen(fd, 'w', encoding='utf-16') as f:
+                f.write(' '.join(title.splitlines()) + '\n' + message)
             
             # Run VBS hidden
             startupinfo = None
@@ -233,12 +393,17 @@ def _try_balloon_tip(self, title: str, message: str) -> bool:
                 startupinfo = subprocess.STARTUPINFO()
                 startupinfo.dwFlags |= subprocess.STARTF_USESHOWWINDOW
             
-            subprocess.Popen(
-                ['wscript', path],
-                startupinfo=startupinfo,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE
-            )
+            try:
+                subprocess.Popen(
+                    ['wscript', self._vbs_path, data_path],
+                    startupinfo=startupinfo,
+                    stdout=subprocess.PIPE,
+                    stderr=subprocess.PIPE
+                )
+            except Exception:
+                # The script deletes the data file; clean it up if it never ran
+                os.unlink(data_path)
+                raise
             
             # Give time for process to start
             time.sleep(0.5)
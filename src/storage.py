@@ -1,12 +1,144 @@
 import sqlite3
-import json
 import logging
-from datetime import datetime, timedelta
-from typing import Dict, Any, List, Optional
+import msgpack
+from datetime import datetime
+from typing import Dict, Any, Iterator, List, Optional, Sequence, Tuple
 import os
+import threading
+import time
+from contextlib import contextmanager
+
+from .jsonutil import loads
 
 logger = logging.getLogger(__name__)
 
+SECONDS_PER_DAY = 86400
+
+# Minimum seconds between automatic cleanups of old data
+CLEANUP_INTERVAL_SECONDS = 3600
+
+# Numeric weather_data columns, with the SQL used to fill them from the JSON
+# text of rows written before the columns existed
+_VALUE_COLUMNS = {
+    'temperature': "json_extract(data, '$.temperature.current')",
+    'feels_like': "json_extract(data, '$.temperature.feels_like')",
+    'humidity': "json_extract(data, '$.humidity')",
+    'pressure': "json_extract(data, '$.pressure')",
+    'wind_speed': "json_extract(data, '$.wind.speed')",
+    'precip': "COALESCE(json_extract(data, '$.precipitation.rain'), 0)"
+              " + COALESCE(json_extract(data, '$.precipitation.snow'), 0)",
+}
+
+# weather_data columns that iter_weather_data can select
+_WEATHER_FIELDS = ('timestamp', 'data') + tuple(_VALUE_COLUMNS)
+
+# Rows fetched per batch when iterating query results
+FETCH_BATCH_SIZE = 256
+
+# Column holding each condition supported by get_statistics
+_STAT_COLUMNS = {
+    'temperature': 'temperature',
+    'feels_like': 'feels_like',
+    'humidity': 'humidity',
+    'pressure': 'pressure',
+    'wind': 'wind_speed',
+    'precipitation': 'precip',
+}
+
+# Columns of each table besides the timestamp, used when migrating older tables
+_TABLE_COLUMNS = {
+    'weather_data': ['location', 'data'] + list(_VALUE_COLUMNS),
+    'alerts': ['id', 'location', 'condition', 'threshold', 'current_value', 'message'],
+}
+
+# Indexes that belong to tables created by older versions
+_LEGACY_INDEXES = {
+    'weather_data': 'idx_weather_location_time',
+    'alerts': 'idx_alerts_location_time',
+}
+
+# Hot-path statements, kept as constants so every call reuses the same
+# SQL text and hits the connection's prepared statement cache
+_SQL_INSERT_WEATHER = (
+    'INSERT OR REPLACE INTO weather_data (location, timestamp, data, temperature, feels_like, '
+    'humidity, pressure, wind_speed, precip) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)'
+)
+_SQL_MAX_ALERT_ID = 'SELECT COALESCE(MAX(id), 0) FROM alerts'
+_SQL_INSERT_ALERT = (
+    'INSERT INTO alerts (id, location, condition, threshold, current_value, message, timestamp) '
+    'VALUES (?, ?, ?, ?, ?, ?, ?)'
+)
+_SQL_SELECT_ALERTS = (
+    'SELECT location, condition, threshold, current_value, message, timestamp FROM alerts '
+    'WHERE timestamp > ? ORDER BY timestamp DESC'
+)
+_SQL_SELECT_LOCATION_ALERTS = (
+    'SELECT location, condition, threshold, current_value, message, timestamp FROM alerts '
+    'WHERE location = ? AND timestamp > ? ORDER BY timestamp DESC'
+)
+_SQL_DELETE_OLD_WEATHER = 'DELETE FROM weather_data WHERE timestamp < ?'
+_SQL_DELETE_OLD_ALERTS = 'DELETE FROM alerts WHERE timestamp < ?'
+
+# Statistics query for each condition in _STAT_COLUMNS
+_SQL_STATISTICS = {
+    condition: f'SELECT MIN({column}), MAX({column}), AVG({column}), COUNT({column}) '
+               'FROM weather_data WHERE location = ? AND timestamp > ?'
+    for condition, column in _STAT_COLUMNS.items()
+}
+
+# Prepared statements cached per connection (sqlite3 defaults to 128)
+STATEMENT_CACHE_SIZE = 256
+
+def _to_epoch(value: Any) -> int:
+    """
+    Convert an ISO timestamp string (or epoch number) to integer epoch seconds.
+    Missing or unparseable values fall back to the current time.
+    """
+    if isinstance(value, (int, float)):
+        return int(value)
+    try:
+        return int(datetime.fromisoformat(value).timestamp())
+    except (TypeError, ValueError):
+        return int(time.time())
+
+def _extract_values(data: Dict[str, Any]) -> Tuple[Optional[float], ...]:
+    """Extract the numeric column values (in _VALUE_COLUMNS order) from weather data."""
+    temperature = data.get('temperature') or {}
+    wind = data.get('wind') or {}
+    precipitation = data.get('precipitation') or {}
+    rain = precipitation.get('rain') or 0
+    snow = precipitation.get('snow') or 0
+    
+    return (
+        temperature.get('current'),
+        temperature.get('feels_like'),
+        data.get('humidity'),
+        data.get('pressure'),
+        wind.get('speed'),
+        rain + snow,
+    )
+
+def _cutoff_epoch(days: int) -> int:
+    """Epoch seconds N days before now."""
+    return int(time.time()) - days * SECONDS_PER_DAY
+
+def _encode_data(data: Dict[str, Any]) -> bytes:
+    """Serialize weather data for the data column."""
+    return msgpack.packb(data, use_bin_type=True)
+
+def _decode_data(blob: Any) -> Dict[str, Any]:
+    """
+    Deserialize the data column: MessagePack blobs, or JSON text written by
+    older versions. Raises ValueError if the value cannot be decoded.
+    """
+    if isinstance(blob, bytes):
+        return msgpack.unpackb(blob, raw=False)
+    return loads(blob)
+
+def _format_iso(timestamp: int) -> str:
+    """Format integer epoch seconds as a local ISO timestamp for display."""
+    return datetime.fromtimestamp(timestamp).isoformat()
+
 class WeatherDatabase:
     """
     Handles storage and retrieval of weather data and alerts.
@@ -19,109 +151,235 @@ def __init__(self, db_path: str):
         # Ensure directory exists
         os.makedirs(os.path.dirname(db_path), exist_ok=True)
         
+        # Single long-lived connection shared by all methods; autocommit mode,
+        # writes are framed explicitly by _write_transaction
+        self._conn = sqlite3.connect(
+            db_path, check_same_thread=False, isolation_level=None,
+            cached_statements=STATEMENT_CACHE_SIZE
+        )
+        self._lock = threading.RLock()
+        self._last_cleanup: Optional[float] = None  # None until the first cleanup
+        
         # Initialize database
         self._init_db()
     
+    def close(self):
+        """Close the database connection."""
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+    
+    @contextmanager
+    def _write_transaction(self) -> Iterator[sqlite3.Connection]:
+        """
+        Run the block in a BEGIN IMMEDIATE transaction, committed on success
+        and rolled back on error, while holding the connection lock.
+        """
+        with self._lock:
+            conn = self._conn
+            conn.execute('BEGIN IMMEDIATE')
+            try:
+                yield conn
+            except BaseException:
+                conn.execute('ROLLBACK')
+                raise
+            conn.execute('COMMIT')
+    
     def _init_db(self):
-        """Create database tables if they don't exist."""
+        """Configure the connection and create database tables if they don't exist."""
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            
-            # Create weather data table
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS weather_data (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    location TEXT NOT NULL,
-                    timestamp TEXT NOT NULL,
-                    data TEXT NOT NULL
-                )
-            ''')
-            
-            # Create alerts table
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS alerts (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    location TEXT NOT NULL,
-                    condition TEXT NOT NULL,
-                    threshold REAL NOT NULL,
-                    current_value REAL NOT NULL,
-                    message TEXT NOT NULL,
-                    timestamp TEXT NOT NULL
-                )
-            ''')
+            conn = self._conn
             
-            # Create indexes for faster queries
-            cursor.execute('''
-                CREATE INDEX IF NOT EXISTS idx_weather_location_time
-                ON weather_data (location, timestamp)
-            ''')
+            # WAL lets readers and the writer work concurrently; NORMAL sync is
+            # durable across application crashes, which is enough for a weather log
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            conn.execute('PRAGMA temp_store=MEMORY')
+            conn.execute('PRAGMA cache_size=-64000')
+            conn.execute('PRAGMA mmap_size=268435456')
             
-            cursor.execute('''
-                CREATE INDEX IF NOT EXISTS idx_alerts_location_time
-                ON alerts (location, timestamp)
-            ''')
-            
-            conn.commit()
-            conn.close()
+            with self._write_transaction():
+                self._create_tables(conn.cursor())
             
             logger.info(f"Database initialized at {self.db_path}")
         except sqlite3.Error as e:
             logger.error(f"Database initialization error: {e}")
             raise
     
+    def _create_tables(self, cursor: sqlite3.Cursor):
+        """Create database tables, migrating tables created by older versions."""
+        # Move aside tables created by older versions (rowid tables)
+        legacy_tables = self._detach_legacy_tables(cursor)
+        
+        # Weather data, clustered by location and newest timestamp (epoch seconds)
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS weather_data (
+                location TEXT NOT NULL,
+                timestamp INTEGER NOT NULL,
+                data BLOB NOT NULL,
+                temperature REAL,
+                feels_like REAL,
+                humidity REAL,
+                pressure REAL,
+                wind_speed REAL,
+                precip REAL,
+                PRIMARY KEY (location, timestamp DESC)
+            ) WITHOUT ROWID
+        ''')
+        
+        # Alerts; id keeps alerts triggered in the same second unique
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS alerts (
+                id INTEGER NOT NULL,
+                location TEXT NOT NULL,
+                condition TEXT NOT NULL,
+                threshold REAL NOT NULL,
+                current_value REAL NOT NULL,
+                message TEXT NOT NULL,
+                timestamp INTEGER NOT NULL,
+                PRIMARY KEY (location, timestamp DESC, id)
+            ) WITHOUT ROWID
+        ''')
+        
+        # Lets MAX(id) for new alert ids read one index entry instead of scanning
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_alerts_id ON alerts (id)')
+        
+        # Timestamp indexes let cleanup delete by range instead of scanning
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_weather_ts ON weather_data (timestamp)')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_alerts_ts ON alerts (timestamp)')
+        
+        for table, legacy_columns in legacy_tables.items():
+            self._copy_legacy_rows(cursor, table, legacy_columns)
+    
+    def _detach_legacy_tables(self, cursor: sqlite3.Cursor) -> Dict[str, Dict[str, str]]:
+        """
+        Rename tables created by older versions (rowid tables, possibly with
+        ISO text timestamps) to <table>_legacy so they can be recreated.
+        Returns the renamed tables with their column types.
+        """
+        legacy_tables = {}
+        for table in _TABLE_COLUMNS:
+            row = cursor.execute(
+                "SELECT sql FROM sqlite_master WHERE type = 'table' AND name = ?", (table,)
+            ).fetchone()
+            if row is None or 'WITHOUT ROWID' in row[0].upper():
+                continue
+            
+            columns = {info[1]: info[2].upper() for info in cursor.execute(f'PRAGMA table_info({table})')}
+            cursor.execute(f'DROP INDEX IF EXISTS {_LEGACY_INDEXES[table]}')
+            cursor.execute(f'ALTER TABLE {table} RENAME TO {table}_legacy')
+            legacy_tables[table] = columns
+        
+        return legacy_tables
+    
+    def _copy_legacy_rows(self, cursor: sqlite3.Cursor, table: str, legacy_columns: Dict[str, str]):
+        """
+        Copy rows from a legacy table, converting local ISO text timestamps to
+        epoch seconds, then drop it. Weather rows that collide on
+        (location, timestamp) keep the most recently written one.
+        """
+        columns = ', '.join(c for c in _TABLE_COLUMNS[table] if c in legacy_columns)
+        
+        if legacy_columns.get('timestamp') == 'TEXT':
+            timestamp = "CAST(strftime('%s', timestamp, 'utc') AS INTEGER)"
+            where = "WHERE strftime('%s', timestamp, 'utc') IS NOT NULL"
+        else:
+            timestamp = 'timestamp'
+            where = ''
+        
+        insert = 'INSERT OR REPLACE' if table == 'weather_data' else 'INSERT'
+        copied = cursor.execute(
+            f'{insert} INTO {table} ({columns}, timestamp) '
+            f'SELECT {columns}, {timestamp} FROM {table}_legacy {where} ORDER BY rowid'
+        ).rowcount
+        cursor.execute(f'DROP TABLE {table}_legacy')
+        logger.info(f"Migrated {copied} {table} rows")
+        
+        if table == 'weather_data' and not all(c in legacy_columns for c in _VALUE_COLUMNS):
+            self._backfill_value_columns(cursor)
+    
+    def _backfill_value_columns(self, cursor: sqlite3.Cursor):
+        """Fill the numeric value columns of rows migrated from JSON text data."""
+        assignments = ', '.join(f'{column} = {expr}' for column, expr in _VALUE_COLUMNS.items())
+        try:
+            updated = cursor.execute(
+                f"UPDATE weather_data SET {assignments} WHERE typeof(data) = 'text'"
+            ).rowcount
+            logger.info(f"Filled value columns for {updated} weather_data rows")
+        except sqlite3.OperationalError as e:
+            # SQLite builds without the JSON functions; statistics cover new rows only
+            logger.warning(f"Could not fill value columns from stored data: {e}")
+    
     def store_weather_data(self, location: str, data: Dict[str, Any]):
         """Store weather data for a location."""
+        self.store_weather_data_many([(location, data)])
+    
+    def store_weather_data_many(self, entries: List[Tuple[str, Dict[str, Any]]]):
+        """Store a batch of (location, weather data) entries in one transaction."""
+        if not entries:
+            return
+        
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
+            # Serialize data for storage
+            rows = [
+                (location, _to_epoch(data.get('timestamp')), _encode_data(data), *_extract_values(data))
+                for location, data in entries
+            ]
             
-            # Convert data to JSON for storage
-            data_json = json.dumps(data)
-            timestamp = data.get('timestamp', datetime.now().isoformat())
+            with self._write_transaction() as conn:
+                conn.executemany(_SQL_INSERT_WEATHER, rows)
             
-            cursor.execute(
-                'INSERT INTO weather_data (location, timestamp, data) VALUES (?, ?, ?)',
-                (location, timestamp, data_json)
-            )
+            logger.debug(f"Stored {len(rows)} weather records")
             
-            conn.commit()
-            conn.close()
-            
-            logger.debug(f"Stored weather data for {location} at {timestamp}")
-            
-            # Clean up old data
-            self._cleanup_old_data()
+            # Clean up old data at most once per interval
+            if (self._last_cleanup is None
+                    or time.monotonic() - self._last_cleanup > CLEANUP_INTERVAL_SECONDS):
+                self._cleanup_old_data()
         except sqlite3.Error as e:
             logger.error(f"Error storing weather data: {e}")
     
+    def iter_weather_data(self, location: str, days: int = 1,
+                          fields: Optional[Sequence[str]] = None) -> Iterator[Tuple[Any, ...]]:
+        """
+        Yield weather rows for a location from the last N days, newest first.
+        fields selects the columns of each row tuple (default: timestamp, data);
+        use the numeric value columns to avoid decoding the data blob.
+        """
+        fields = tuple(fields or ('timestamp', 'data'))
+        unknown = [field for field in fields if field not in _WEATHER_FIELDS]
+        if unknown:
+            raise ValueError(f"Unknown weather data fields: {unknown}")
+        
+        # Calculate cutoff date
+        cutoff_date = _cutoff_epoch(days)
+        
+        with self._lock:
+            cursor = self._conn.execute(
+                f'SELECT {", ".join(fields)} FROM weather_data '
+                'WHERE location = ? AND timestamp > ? ORDER BY timestamp DESC',
+                (location, cutoff_date)
+            )
+        
+        while True:
+            with self._lock:
+                rows = cursor.fetchmany(FETCH_BATCH_SIZE)
+            if not rows:
+                return
+            yield from rows
+    
     def get_weather_data(self, location: str, days: int = 1) -> List[Dict[str, Any]]:
         """
         Retrieve weather data for a location from the last N days.
         Returns a list of weather data entries.
         """
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            
-            # Calculate cutoff date
-            cutoff_date = (datetime.now() - timedelta(days=days)).isoformat()
-            
-            cursor.execute(
-                'SELECT timestamp, data FROM weather_data WHERE location = ? AND timestamp > ? ORDER BY timestamp DESC',
-                (location, cutoff_date)
-            )
-            
             results = []
-            for row in cursor.fetchall():
-                timestamp, data_json = row
+            for timestamp, blob in self.iter_weather_data(location, days):
                 try:
-                    data = json.loads(data_json)
-                    results.append(data)
-                except json.JSONDecodeError:
-                    logger.warning(f"Error decoding weather data JSON for {location} at {timestamp}")
-            
-            conn.close()
+                    results.append(_decode_data(blob))
+                except ValueError:
+                    logger.warning(f"Error decoding weather data for {location} at {_format_iso(timestamp)}")
             
             logger.debug(f"Retrieved {len(results)} weather records for {location}")
             return results
@@ -131,68 +389,73 @@ def get_weather_data(self, location: str, days: int = 1) -> List[Dict[str, Any]]
     
     def store_alert(self, alert: Dict[str, Any]):
         """Store an alert that was triggered."""
+        self.store_alerts_many([alert])
+    
+    def store_alerts_many(self, alerts: List[Dict[str, Any]]):
+        """Store a batch of triggered alerts in one transaction."""
+        if not alerts:
+            return
+        
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            
-            location = alert.get('location', 'Unknown')
-            condition = alert.get('condition', 'Unknown')
-            threshold = alert.get('threshold', 0)
-            current_value = alert.get('current_value', 0)
-            message = alert.get('message', '')
-            timestamp = alert.get('timestamp', datetime.now().isoformat())
-            
-            cursor.execute(
-                'INSERT INTO alerts (location, condition, threshold, current_value, message, timestamp) VALUES (?, ?, ?, ?, ?, ?)',
-                (location, condition, threshold, current_value, message, timestamp)
-            )
-            
-            conn.commit()
-            conn.close()
-            
-            logger.debug(f"Stored alert for {location} at {timestamp}")
+            with self._write_transaction() as conn:
+                # Assign ids after the current maximum inside the write transaction
+                last_id = conn.execute(_SQL_MAX_ALERT_ID).fetchone()[0]
+                rows = [
+                    (
+                        last_id + i,
+                        alert.get('location', 'Unknown'),
+                        alert.get('condition', 'Unknown'),
+                        alert.get('threshold', 0),
+                        alert.get('current_value', 0),
+                        alert.get('message', ''),
+                        _to_epoch(alert.get('timestamp'))
+                    )
+                    for i, alert in enumerate(alerts, 1)
+                ]
+                
+                conn.executemany(_SQL_INSERT_ALERT, rows)
+            
+            logger.debug(f"Stored {len(rows)} alerts")
         except sqlite3.Error as e:
-            logger.error(f"Error storing alert: {e}")
+            logger.error(f"Error storing alerts: {e}")
+    
+    def iter_alerts(self, location: Optional[str] = None, days: int = 7) -> Iterator[sqlite3.Row]:
+        """
+        Yield alerts from the last N days, newest first, as sqlite3.Row objects
+        (location, condition, threshold, current_value, message, timestamp),
+        with the timestamp in epoch seconds. If location is specified, filter by location.
+        """
+        # Calculate cutoff date
+        cutoff_date = _cutoff_epoch(days)
+        
+        with self._lock:
+            cursor = self._conn.cursor()
+            cursor.row_factory = sqlite3.Row
+            if location:
+                cursor.execute(_SQL_SELECT_LOCATION_ALERTS, (location, cutoff_date))
+            else:
+                cursor.execute(_SQL_SELECT_ALERTS, (cutoff_date,))
+        
+        while True:
+            with self._lock:
+                rows = cursor.fetchmany(FETCH_BATCH_SIZE)
+            if not rows:
+                return
+            yield from rows
     
     def get_alerts(self, location: Optional[str] = None, days: int = 7) -> List[Dict[str, Any]]:
         """
         Retrieve alerts from the last N days.
         If location is specified, filter by location.
-        Returns a list of alert entries.
+        Returns a list of alert entries with ISO timestamps.
         """
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            
-            # Calculate cutoff date
-            cutoff_date = (datetime.now() - timedelta(days=days)).isoformat()
-            
-            if location:
-                cursor.execute(
-                    'SELECT location, condition, threshold, current_value, message, timestamp FROM alerts WHERE location = ? AND timestamp > ? ORDER BY timestamp DESC',
-                    (location, cutoff_date)
-                )
-            else:
-                cursor.execute(
-                    'SELECT location, condition, threshold, current_value, message, timestamp FROM alerts WHERE timestamp > ? ORDER BY timestamp DESC',
-                    (cutoff_date,)
-                )
-            
             results = []
-            for row in cursor.fetchall():
-                loc, cond, thresh, current, msg, ts = row
-                alert = {
-                    'location': loc,
-                    'condition': cond,
-                    'threshold': thresh,
-                    'current_value': current,
-                    'message': msg,
-                    'timestamp': ts
-                }
+            for row in self.iter_alerts(location, days):
+                alert = dict(row)
+                alert['timestamp'] = _format_iso(alert['timestamp'])
                 results.append(alert)
             
-            conn.close()
-            
             logger.debug(f"Retrieved {len(results)} alerts")
             return results
         except sqlite3.Error as e:
@@ -200,32 +463,25 @@ def get_alerts(self, location: Optional[str] = None, days: int = 7) -> List[Dict
             return []
     
     def _cleanup_old_data(self, days: int = 30):
-        """Delete weather data older than N days."""
+        """Delete weather data and alerts older than N days in one transaction."""
+        self._last_cleanup = time.monotonic()
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            
             # Calculate cutoff date
-            cutoff_date = (datetime.now() - timedelta(days=days)).isoformat()
-            
-            # Delete old weather data
-            cursor.execute(
-                'DELETE FROM weather_data WHERE timestamp < ?',
-                (cutoff_date,)
-            )
-            
-            # Delete old alerts
-            cursor.execute(
-                'DELETE FROM alerts WHERE timestamp < ?',
-                (cutoff_date,)
-            )
-            
-            conn.commit()
-            
-            if cursor.rowcount > 0:
-                logger.info(f"Cleaned up {cursor.rowcount} old records")
-            
-            conn.close()
+            cutoff_date = _cutoff_epoch(days)
+            
+            with self._write_transaction() as conn:
+                # Delete old weather data
+                deleted = conn.execute(_SQL_DELETE_OLD_WEATHER, (cutoff_date,)).rowcount
+                
+                # Delete old alerts
+                deleted += conn.execute(_SQL_DELETE_OLD_ALERTS, (cutoff_date,)).rowcount
+            
+            if deleted > 0:
+                logger.info(f"Cleaned up {deleted} old records")
+                
+                # Reset the WAL file so the space freed by the deletes is reclaimed
+                with self._lock:
+                    self._conn.execute('PRAGMA wal_checkpoint(TRUNCATE)')
         except sqlite3.Error as e:
             logger.error(f"Error cleaning up old data: {e}")
     
@@ -234,50 +490,35 @@ def get_statistics(self, location: str, condition: str, days: int = 7) -> Dict[s
         Calculate statistics for a specific condition at a location.
         Returns a dictionary with min, max, avg values over the period.
         """
-        weather_data = self.get_weather_data(location, days)
+        empty = {
+            'min': None,
+            'max': None,
+            'avg': None,
+            'count': 0
+        }
         
-        if not weather_data:
-            return {
-                'min': None,
-                'max': None,
-                'avg': None,
-                'count': 0
-            }
+        query = _SQL_STATISTICS.get(condition)
+        if query is None:
+            return empty
         
-        values = []
-        for entry in weather_data:
-            # Extract the condition value based on the condition type
-            if condition == 'temperature':
-                value = entry.get('temperature', {}).get('current')
-            elif condition == 'feels_like':
-                value = entry.get('temperature', {}).get('feels_like')
-            elif condition == 'humidity':
-                value = entry.get('humidity')
-            elif condition == 'pressure':
-                value = entry.get('pressure')
-            elif condition == 'wind':
-                value = entry.get('wind', {}).get('speed')
-            elif condition == 'precipitation':
-                rain = entry.get('precipitation', {}).get('rain', 0)
-                snow = entry.get('precipitation', {}).get('snow', 0)
-                value = rain + snow
-            else:
-                value = None
+        try:
+            # Calculate cutoff date
+            cutoff_date = _cutoff_epoch(days)
             
-            if value is not None:
-                values.append(value)
+            with self._lock:
+                min_value, max_value, avg_value, count = self._conn.execute(
+                    query, (location, cutoff_date)
+                ).fetchone()
+        except sqlite3.Error as e:
+            logger.error(f"Error calculating statistics: {e}")
+            return empty
         
-        if not values:
-            return {
-                'min': None,
-                'max': None,
-                'avg': None,
-                'count': 0
-            }
+        if not count:
+            return empty
         
         return {
-            'min': min(values),
-            'max': max(values),
-            'avg': sum(values) / len(values),
-            'count': len(values)
+            'min': min_value,
+            'max': max_value,
+            'avg': avg_value,
+            'count': count
         }
@@ -2,28 +2,31 @@
 # -*- coding: utf-8 -*-
 
 import argparse
-import json
 import logging
 import os
 import sys
 import time
 from datetime import datetime, timedelta
 from pathlib import Path
-from typing import Dict, Any, List
+from typing import TYPE_CHECKING, Dict, Any, List, NamedTuple, Optional, Tuple
+
+from src.jsonutil import JSONDecodeError, dumps, loads
 
 # Fix encoding for Windows
 if sys.platform.startswith('win'):
     sys.stdout.reconfigure(encoding='utf-8')
     sys.stderr.reconfigure(encoding='utf-8')
 
-# Add src directory to path
-sys.path.insert(0, os.path.join(os.path.dirname(__file__), "src"))
+# Project modules are imported by the commands that need them, so config
+# commands and --help don't pay for requests, sqlite3 and notification setup
+if TYPE_CHECKING:
+    from src.api import WeatherAPI
+    from src.alerts import AlertChecker
+    from src.notifier import Notifier
+    from src.storage import WeatherDatabase
 
-# Import project modules
-from src.api import WeatherAPI
-from src.alerts import AlertChecker
-from src.notifier import Notifier
-from src.storage import WeatherDatabase
+# Parsed configuration per path, keyed by the file's mtime
+_config_cache: Dict[str, Tuple[int, Dict[str, Any]]] = {}
 
 # Set up logging
 def setup_logging(log_level: str, log_file: str = None):
@@ -49,8 +52,34 @@ def setup_logging(log_level: str, log_file: str = None):
             format=log_format
         )
 
+def _save_config_if_changed(config_path: str, config: Dict[str, Any]) -> bool:
+    """
+    Write the configuration atomically (temporary file, then os.replace),
+    skipping the write if the file already holds the same content.
+    Returns True if the file was written.
+    """
+    new_blob = dumps(config, indent=True)
+    
+    try:
+        with open(config_path, 'rb') as f:
+            if f.read() == new_blob:
+                return False
+    except FileNotFoundError:
+        pass
+    
+    tmp_path = f"{config_path}.tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(new_blob)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, config_path)
+    return True
+
 def load_config(config_path: str) -> Dict[str, Any]:
-    """Load configuration from file, creating default if it doesn't exist."""
+    """
+    Load configuration from file, creating default if it doesn't exist.
+    The parsed result is cached until the file's modification time changes.
+    """
     config_file = Path(config_path)
     
     if not config_file.exists():
@@ -81,17 +110,24 @@ def load_config(config_path: str) -> Dict[str, Any]:
         config_file.parent.mkdir(parents=True, exist_ok=True)
         
         # Write default config
-        with open(config_file, 'w', encoding='utf-8') as f:
-            json.dump(default_config, f, indent=2, ensure_ascii=False)
+        _save_config_if_changed(config_path, default_config)
         
         print(f"Created default configuration at {config_file}")
         print("Please edit the configuration with your API key and settings.")
         return default_config
     
+    # Reuse the parsed configuration while the file is unchanged
+    mtime_ns = config_file.stat().st_mtime_ns
+    cached = _config_cache.get(config_path)
+    if cached and cached[0] == mtime_ns:
+        return cached[1]
+    
     try:
-        with open(config_file, 'r', encoding='utf-8') as f:
-            return json.load(f)
-    except json.JSONDecodeError:
+        with open(config_file, 'rb') as f:
+            config = loads(f.read())
+        _config_cache[config_path] = (mtime_ns, config)
+        return config
+    except JSONDecodeError:
         print(f"Error: {config_file} is not valid JSON")
         sys.exit(1)
 
@@ -100,10 +136,11 @@ def add_location(config_path: str, name: str, latitude: float, longitude: float)
     config = load_config(config_path)
     
     # Check if location already exists
-    for location in config.get('locations', []):
-        if location.get('name') == name:
-            print(f"Location '{name}' already exists")
-            return
+    locations = config.setdefault('locations', [])
+    by_name = {loc.get('name'): loc for loc in locations}
+    if name in by_name:
+        print(f"Location '{name}' already exists")
+        return
     
     # Add new location
     new_location = {
@@ -113,11 +150,10 @@ def add_location(config_path: str, name: str, latitude: float, longitude: float)
         "alerts": []
     }
     
-    config.setdefault('locations', []).append(new_location)
+    locations.append(new_location)
     
     # Save updated config
-    with open(config_path, 'w', encoding='utf-8') as f:
-        json.dump(config, f, indent=2, ensure_ascii=False)
+    _save_config_if_changed(config_path, config)
     
     print(f"Added location '{name}' at {latitude}, {longitude}")
 
@@ -126,38 +162,29 @@ def add_alert(config_path: str, location: str, condition: str, operator: str, va
     config = load_config(config_path)
     
     # Find the location
-    location_found = False
-    for loc in config.get('locations', []):
-        if loc.get('name') == location:
-            location_found = True
-            
-            # Create new alert
-            new_alert = {
-                "condition": condition,
-                "operator": operator,
-                "value": value,
-                "message": message
-            }
-            
-            # Add alert if it doesn't already exist
-            alerts = loc.setdefault('alerts', [])
-            for alert in alerts:
-                if (alert.get('condition') == condition and 
-                    alert.get('operator') == operator and 
-                    alert.get('value') == value):
-                    print(f"Alert already exists for {location}")
-                    return
-            
-            alerts.append(new_alert)
-            break
-    
-    if not location_found:
+    by_name = {loc.get('name'): loc for loc in config.get('locations', [])}
+    loc = by_name.get(location)
+    if loc is None:
         print(f"Location '{location}' not found in configuration")
         return
     
+    # Add alert if it doesn't already exist
+    alerts = loc.setdefault('alerts', [])
+    existing = {(alert.get('condition'), alert.get('operator'), alert.get('value')) for alert in alerts}
+    if (condition, operator, value) in existing:
+        print(f"Alert already exists for {location}")
+        return
+    
+    # Create new alert
+    alerts.append({
+        "condition": condition,
+        "operator": operator,
+        "value": value,
+        "message": message
+    })
+    
     # Save updated config
-    with open(config_path, 'w', encoding='utf-8') as f:
-        json.dump(config, f, indent=2, ensure_ascii=False)
+    _save_config_if_changed(config_path, config)
     
     print(f"Added alert for {condition} {operator} {value} to '{location}'")
 
@@ -187,24 +214,56 @@ def list_locations(config_path: str):
             
             print(f"   {j}. {condition} {operator} {value} - {message}")
 
-def check_now(config_path: str, db_path: str, log_file: str):
-    """Run a single check of all locations and send alerts if needed."""
-    setup_logging("INFO", log_file)
-    logger = logging.getLogger("weather_alert")
+class CheckContext(NamedTuple):
+    """Components shared by every weather check."""
+    config_path: str
+    api: 'WeatherAPI'
+    alert_checker: 'AlertChecker'
+    notifier: 'Notifier'
+    db: 'WeatherDatabase'
+
+def _build_context(config_path: str, db_path: str) -> Optional[CheckContext]:
+    """Initialize the components used for checks. Returns None on failure."""
+    from src.api import WeatherAPI
+    from src.alerts import AlertChecker
+    from src.notifier import Notifier
+    from src.storage import WeatherDatabase
     
+    logger = logging.getLogger("weather_alert")
     config = load_config(config_path)
     
-    # Initialize components
     try:
-        api = WeatherAPI(config.get('api', {}))
-        alert_checker = AlertChecker(config_path)
-        notifier = Notifier(config_path)
-        db = WeatherDatabase(db_path)
+        return CheckContext(
+            config_path=config_path,
+            api=WeatherAPI(config.get('api', {})),
+            alert_checker=AlertChecker(config_path),
+            notifier=Notifier(config_path),
+            db=WeatherDatabase(db_path)
+        )
     except Exception as e:
         logger.error(f"Initialization error: {e}")
-        return
+        return None
+
+def _close_context(ctx: CheckContext):
+    """Release resources held by the check components."""
+    ctx.notifier.close()
+    ctx.db.close()
+
+def _check_once(ctx: CheckContext):
+    """Run a single check of all locations and send alerts if needed."""
+    logger = logging.getLogger("weather_alert")
+    
+    # Pick up configuration changes (no-ops while the file is unchanged)
+    config = load_config(ctx.config_path)
+    ctx.alert_checker.refresh_config()
+    ctx.notifier.refresh_config()
+    
+    # Results from all locations are stored and notified together after the loop
+    weather_batch = []
+    all_alerts = []
     
-    # Check each location
+    # Skip locations with incomplete data
+    locations = []
     for location in config.get('locations', []):
         name = location.get('name')
         lat = location.get('latitude')
@@ -214,29 +273,57 @@ def check_now(config_path: str, db_path: str, log_file: str):
             logger.warning(f"Skipping location with incomplete data: {location}")
             continue
         
+        locations.append((name, lat, lon))
+        logger.info(f"Checking weather for {name}")
+    
+    # Fetch all locations concurrently and check each result as it arrives
+    coordinates = [(lat, lon) for name, lat, lon in locations]
+    for i, weather_data, error in ctx.api.get_current_weather_batch(coordinates):
+        name = locations[i][0]
         try:
-            # Get current weather
-            logger.info(f"Checking weather for {name}")
-            weather_data = api.get_current_weather(lat, lon)
+            if error is not None:
+                raise error
             
-            # Store in database
-            db.store_weather_data(name, weather_data)
+            weather_batch.append((name, weather_data))
             
             # Check for alerts
-            triggered_alerts = alert_checker.check_location_alerts(name, weather_data)
-            
-            # Send notifications for triggered alerts
-            for alert in triggered_alerts:
-                notifier.send_alert(alert)
-                db.store_alert(alert)
+            triggered_alerts = ctx.alert_checker.check_location_alerts(name, weather_data)
+            all_alerts.extend(triggered_alerts)
             
             if triggered_alerts:
-                logger.info(f"Sent {len(triggered_alerts)} alerts for {name}")
+                logger.info(f"{len(triggered_alerts)} alerts triggered for {name}")
             else:
                 logger.info(f"No alerts triggered for {name}")
                 
         except Exception as e:
             logger.error(f"Error checking {name}: {e}")
+    
+    # Store everything from this check in one transaction per table
+    ctx.db.store_weather_data_many(weather_batch)
+    ctx.db.store_alerts_many(all_alerts)
+    
+    # Send one notification for all alerts triggered during this check
+    if all_alerts:
+        try:
+            if ctx.notifier.send_alerts(all_alerts):
+                logger.info(f"Sent {len(all_alerts)} alerts")
+            else:
+                logger.warning(f"Could not send {len(all_alerts)} alerts")
+        except Exception as e:
+            logger.error(f"Error sending alerts: {e}")
+
+def check_now(config_path: str, db_path: str, log_file: str):
+    """Run a single check of all locations and send alerts if needed."""
+    setup_logging("INFO", log_file)
+    
+    ctx = _build_context(config_path, db_path)
+    if ctx is None:
+        return
+    
+    try:
+        _check_once(ctx)
+    finally:
+        _close_context(ctx)
 
 def run_service(config_path: str, db_path: str, log_file: str):
     """Run as a continuous service, checking periodically."""
@@ -248,9 +335,14 @@ def run_service(config_path: str, db_path: str, log_file: str):
     
     logger.info(f"Starting Weather Alert service, checking every {check_interval} minutes")
     
+    # Components are created once and reused for every check
+    ctx = _build_context(config_path, db_path)
+    if ctx is None:
+        return
+    
     try:
         while True:
-            check_now(config_path, db_path, log_file)
+            _check_once(ctx)
             
             # Sleep until next check
             logger.info(f"Next check in {check_interval} minutes")
@@ -259,6 +351,8 @@ def run_service(config_path: str, db_path: str, log_file: str):
         logger.info("Service stopped by user")
     except Exception as e:
         logger.error(f"Service error: {e}")
+    finally:
+        _close_context(ctx)
 
 def main():
     """Main entry point with argument parsing."""